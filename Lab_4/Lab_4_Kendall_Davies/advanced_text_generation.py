@@ -2,13 +2,208 @@
 """
 Advanced Text Generation Testing for Sherlock Holmes RNN
 This script provides additional testing functions for seeded text generation.
+
+Importing this module sets PYTORCH_CUDA_ALLOC_CONF for the whole process (unless it is
+already set), so it should be imported before anything initializes CUDA.
 """
 
+import os
+import sys
+
+# Let the caching allocator grow segments in place instead of carving up fixed ones. Each
+# harness sizes its own buffers (one batch per test, user-chosen lengths in interactive mode),
+# so successive calls free and request blocks of different sizes that would otherwise fragment.
+# Must be set before torch initializes CUDA (it has no effect if that already happened).
+os.environ.setdefault('PYTORCH_CUDA_ALLOC_CONF', 'expandable_segments:True,max_split_size_mb:128')
+
 import torch
 import numpy as np
-from torch.distributions import Categorical
 
-def generate_text_with_seed(model, character_to_num, num_to_character, seed_phrase, length=200, temperature=1.0):
+class GenerationContext:
+    """
+    Preallocated buffers reused across generation calls
+    
+    Args:
+        model: Trained RNN model (used to size the hidden state when hidden_shape is None)
+        hidden_shape: (num_layers, hidden_size) of the RNN hidden state
+        max_batch: Largest number of seeds generated at once
+        device: Device the buffers live on
+        max_length: Largest number of characters generated per call
+    """
+    
+    def __init__(self, model, hidden_shape=None, max_batch=1, device='cuda', max_length=2048):
+        if hidden_shape is None:
+            hidden_shape = (model.rnn.num_layers, model.rnn.hidden_size)
+        num_layers, hidden_size = hidden_shape
+        
+        self.num_layers, self.hidden_size = num_layers, hidden_size
+        self.max_batch, self.max_length = max_batch, max_length
+        
+        # h and out_ids are stored flat and each call views a prefix of them, so the buffers
+        # handed out are contiguous for any batch size (cuDNN rejects a strided hx; slicing
+        # a (num_layers, max_batch, hidden_size) tensor on dim 1 would produce one)
+        self.h = torch.zeros(num_layers * max_batch * hidden_size, device=device)
+        self.inp = torch.zeros((1, max_batch), dtype=torch.long, device=device)
+        self.out_ids = torch.empty(max_length * max_batch, dtype=torch.long, device=device)
+        
+        # One memory pool shared by the CUDA graphs captured across calls
+        self.graph_pool = torch.cuda.graph_pool_handle() if torch.device(device).type == 'cuda' else None
+    
+    def buffers(self, batch_size, length):
+        """Return a zeroed initial hidden state, an input buffer and an output buffer for one call"""
+        if batch_size > self.max_batch or length > self.max_length:
+            raise ValueError(f"GenerationContext holds at most {self.max_batch} seeds of "
+                             f"{self.max_length} characters, got {batch_size} x {length}")
+        hidden = self.h[:self.num_layers * batch_size * self.hidden_size]
+        hidden = hidden.view(self.num_layers, batch_size, self.hidden_size)
+        out_ids = self.out_ids[:length * batch_size].view(length, batch_size)
+        return hidden.zero_(), self.inp[:, :batch_size], out_ids
+
+def build_character_lut(character_to_num):
+    """
+    Build an array mapping ord(char) -> character index (-1 for characters not in the vocabulary)
+    """
+    lut = np.full(max(256, max(map(ord, character_to_num)) + 1), -1, dtype=np.int64)
+    for char, index in character_to_num.items():
+        lut[ord(char)] = index
+    return lut
+
+# Lookup tables built by _character_lut, keyed on id(character_to_num). The mapping is
+# kept alongside so its id cannot be reused; mappings are assumed fixed after setup.
+_CHARACTER_LUTS = {}
+
+def _character_lut(character_to_num):
+    """Return the lookup table for character_to_num, building it on first use"""
+    key = id(character_to_num)
+    if key not in _CHARACTER_LUTS:
+        _CHARACTER_LUTS[key] = (character_to_num, build_character_lut(character_to_num))
+    return _CHARACTER_LUTS[key][1]
+
+def _seed_to_indices(character_to_num, seed_phrase):
+    """Convert a seed phrase to an array of character indices, skipping unknown characters"""
+    lut = _character_lut(character_to_num)
+    
+    # One vectorized gather over the seed's code points instead of a dict lookup per character
+    codes = np.frombuffer(seed_phrase.encode('utf-32-le'), dtype=np.uint32)
+    seed_indices = np.where(codes < len(lut), lut[np.minimum(codes, len(lut) - 1)], -1)
+    
+    valid = seed_indices >= 0
+    for position in np.flatnonzero(~valid):
+        print(f"Warning: Character '{seed_phrase[position]}' not found in vocabulary, skipping...")
+    return seed_indices[valid]
+
+def encode_seed(character_to_num, seed_phrase):
+    """
+    Convert a seed phrase to a [len, 1] tensor of character indices on the GPU
+    
+    Encode a seed once and pass it to generate_text_with_seed(seed_tensor=...) when the
+    same phrase is generated from repeatedly. Returns None if no character is in the vocabulary.
+    """
+    seed_indices = _seed_to_indices(character_to_num, seed_phrase)
+    if not len(seed_indices):
+        return None
+    # Stage in pinned memory so the host-to-device copy runs asynchronously
+    return torch.from_numpy(seed_indices).pin_memory().to('cuda', non_blocking=True).unsqueeze(1)
+
+def encode_seeds(character_to_num, seeds):
+    """
+    Convert several seed phrases to one left-padded [max_len, len(seeds)] batch on the GPU
+    
+    Every seed is padded at the front so all seeds end on the same timestep; padded
+    positions hold index 0 and are masked out during priming. Seeds with no character in
+    the vocabulary are reported and left out of the batch. Encode a seed list once and
+    pass it to generate_text_batched(encoded=...) to skip re-encoding.
+    
+    Returns:
+        (seed_tensor, seed_lengths, kept) tuple, where kept lists the positions in seeds that
+        make up the batch columns, or None if no seed has a character in the vocabulary
+    """
+    # Encode repeated seeds only once
+    unique_indices = {}
+    for seed_phrase in seeds:
+        if seed_phrase in unique_indices:
+            continue
+        seed_indices = _seed_to_indices(character_to_num, seed_phrase)
+        if not len(seed_indices):
+            print(f"Error: No valid characters in seed phrase '{seed_phrase}'!")
+            seed_indices = None
+        unique_indices[seed_phrase] = seed_indices
+    
+    kept = [i for i, seed_phrase in enumerate(seeds) if unique_indices[seed_phrase] is not None]
+    if not kept:
+        return None
+    return _pad_seed_indices([unique_indices[seeds[i]] for i in kept]) + (kept,)
+
+def _pad_seed_indices(encoded_seeds):
+    """Left-pad already encoded seeds into a (seed_tensor, seed_lengths) batch for encode_seeds"""
+    seed_lengths = torch.tensor([len(seed_indices) for seed_indices in encoded_seeds])
+    max_len = int(seed_lengths.max())
+    
+    seed_tensor = torch.zeros((max_len, len(encoded_seeds)), dtype=torch.long)
+    for b, seed_indices in enumerate(encoded_seeds):
+        seed_tensor[max_len - len(seed_indices):, b] = torch.from_numpy(seed_indices)
+    
+    # Stage in pinned memory so the host-to-device copies run asynchronously
+    return (seed_tensor.pin_memory().to('cuda', non_blocking=True),
+            seed_lengths.pin_memory().to('cuda', non_blocking=True))
+
+def _format_generation(seed_phrase, generated_text):
+    """Format one generated sample the way it is printed by the generators"""
+    return f"Seed: '{seed_phrase}'\nGenerated text:\n{generated_text}\n{'=' * 50}\n"
+
+def _capture_rnn_step(model, static_input, static_hidden, pool=None):
+    """
+    Capture one RNN step as a CUDA graph
+    
+    Replaying the graph runs the model on static_input/static_hidden and writes the
+    new hidden state back into static_hidden, so only the input has to be copied in
+    between replays. The graph allocates from pool (a new private pool if None).
+    Returns the graph and the tensor its logits are written to.
+    """
+    # Warm up on a side stream so one-time initialization is not captured
+    stream = torch.cuda.Stream()
+    stream.wait_stream(torch.cuda.current_stream())
+    with torch.cuda.stream(stream):
+        for _ in range(3):
+            model(static_input, static_hidden)
+    torch.cuda.current_stream().wait_stream(stream)
+    
+    graph = torch.cuda.CUDAGraph()
+    if pool is None:
+        pool = torch.cuda.graph_pool_handle()
+    with torch.cuda.graph(graph, pool=pool):
+        static_output, new_hidden_state = model(static_input, static_hidden)
+        static_hidden.copy_(new_hidden_state)
+    
+    return graph, static_output
+
+def _rnn_step(model, inputs, hidden_state):
+    """Run one RNN step (the function torch.compile sees, with the model as an argument)"""
+    return model(inputs, hidden_state)
+
+# Compiled _rnn_step shared by every model and batch size, built on first use. The model is
+# passed in rather than compiled directly, so no cache entry keeps an old model alive.
+_COMPILED_RNN_STEP = None
+
+def _compiled_model(model):
+    """Return a callable stepping model through the compiled _rnn_step"""
+    global _COMPILED_RNN_STEP
+    if _COMPILED_RNN_STEP is None:
+        _COMPILED_RNN_STEP = torch.compile(_rnn_step, mode='reduce-overhead', fullgraph=True, dynamic=False)
+    compiled = _COMPILED_RNN_STEP
+    
+    def step_model(inputs, hidden_state):
+        # Dynamo only traces nn.RNN with its experimental RNN support switched on
+        # (otherwise the whole forward falls back to eager). Patch the flag around
+        # each call so other torch.compile users in the process keep the default.
+        with torch._dynamo.config.patch(allow_rnn=True):
+            return compiled(model, inputs, hidden_state)
+    
+    return step_model
+
+@torch.inference_mode()
+def generate_text_with_seed(model, character_to_num, num_to_character, seed_phrase, length=200, temperature=1.0,
+                            ctx=None, use_cuda_graph=True, seed_tensor=None):
     """
     Generate text starting with a specific seed phrase
     
@@ -19,87 +214,201 @@ def generate_text_with_seed(model, character_to_num, num_to_character, seed_phra
         seed_phrase: Starting text (e.g., "My dear fellow")
         length: Number of characters to generate
         temperature: Controls randomness (higher = more random)
-    """
-    model.eval()
+        ctx: Optional GenerationContext whose hidden state, input and output buffers are
+            updated in place instead of allocating new ones
+        use_cuda_graph: Capture the per-character RNN step as a CUDA graph and replay it
+        seed_tensor: Optional seed_phrase already encoded with encode_seed
     
-    # Convert seed phrase to character indices
-    seed_indices = []
-    for char in seed_phrase:
-        if char in character_to_num:
-            seed_indices.append(character_to_num[char])
-        else:
-            print(f"Warning: Character '{char}' not found in vocabulary, skipping...")
-            continue
+    The model should already be in eval mode (call model.eval() once before generating).
+    """
+    # Convert seed phrase to character indices on the GPU
+    if seed_tensor is None:
+        seed_tensor = encode_seed(character_to_num, seed_phrase)
     
-    if not seed_indices:
+    if seed_tensor is None:
         print("Error: No valid characters in seed phrase!")
         return ""
     
-    # Convert to tensor and move to GPU
-    seed_tensor = torch.tensor(seed_indices).unsqueeze(1).cuda()
-    
     # Initialize hidden state
-    hidden_state = None
-    
-    # Print the seed phrase
-    print(f"Seed: '{seed_phrase}'")
-    print("Generated text:")
-    print(seed_phrase, end='')
+    if ctx is not None:
+        hidden_state, input_buffer, out_ids = ctx.buffers(1, length)
+        out_ids = out_ids[:, 0]
+    else:
+        hidden_state = None
+        out_ids = torch.empty(length, dtype=torch.long, device='cuda')
     
     generated_text = seed_phrase
     
-    # Use the seed phrase to initialize the model
-    with torch.no_grad():
-        for i in range(len(seed_indices) - 1):
-            input_char = seed_tensor[i:i+1]
-            output, hidden_state = model(input_char, hidden_state)
+    # Use the seed phrase to initialize the model (in the context's hidden state, if given)
+    for i in range(len(seed_tensor) - 1):
+        input_char = seed_tensor[i:i+1]
+        output, new_hidden_state = model(input_char, hidden_state)
+        hidden_state = new_hidden_state if ctx is None else hidden_state.copy_(new_hidden_state)
+    
+    # Now generate new text, keeping every sampled index on the GPU until the end
+    current_input = seed_tensor[-1:]  # Last character of seed
+    if ctx is not None:
+        current_input = input_buffer.copy_(current_input)
+    
+    if use_cuda_graph:
+        # The graph reads from fixed buffers, so give it its own input and hidden state
+        if ctx is None:
+            current_input = current_input.clone()
+        if hidden_state is None:
+            hidden_state = torch.zeros_like(model(current_input, None)[1])
+        graph, static_output = _capture_rnn_step(model, current_input, hidden_state,
+                                                 pool=ctx.graph_pool if ctx is not None else None)
+    
+    for i in range(length):
+        if use_cuda_graph:
+            graph.replay()
+            output = static_output
+        else:
+            output, new_hidden_state = model(current_input, hidden_state)
+            hidden_state = new_hidden_state if ctx is None else hidden_state.copy_(new_hidden_state)
         
-        # Now generate new text
-        current_input = seed_tensor[-1:]  # Last character of seed
+        # Apply temperature scaling in place and sample next character
+        logits = output.view(-1).div_(temperature)
+        character_num = torch.multinomial(torch.softmax(logits, dim=0), 1).squeeze()
+        out_ids[i] = character_num
         
-        for _ in range(length):
-            output, hidden_state = model(current_input, hidden_state)
-            
-            # Apply temperature scaling
-            output = output / temperature
-            
-            # Get probabilities
-            probs = torch.nn.functional.softmax(torch.squeeze(output), dim=0)
-            
-            # Sample next character
-            character_distribution = torch.distributions.Categorical(probs)
-            character_num = character_distribution.sample()
-            
-            # Get the character
-            char = num_to_character[character_num.item()]
-            print(char, end='')
-            generated_text += char
-            
-            # Update input for next iteration
-            current_input = character_num.unsqueeze(0).unsqueeze(1)
-    
-    print("\n" + "="*50)
+        # Update input for next iteration
+        if use_cuda_graph or ctx is not None:
+            current_input.copy_(character_num.view(1, 1))
+        else:
+            current_input = character_num.view(1, 1)
+    
+    # Copy the generated indices back once and decode them
+    id2char = [num_to_character[i] for i in range(len(num_to_character))]
+    generated_text += ''.join(id2char[i] for i in out_ids.tolist())
+    
+    # Print the seed phrase and generated text with a single write
+    sys.stdout.write(_format_generation(seed_phrase, generated_text))
     return generated_text
 
+@torch.inference_mode()
+def generate_text_batched(model, character_to_num, num_to_character, seeds, length=200, temperature=1.0,
+                          ctx=None, use_compile=True, verbose=True, encoded=None):
+    """
+    Generate text for several seed phrases at once in a single batched RNN pass
+    
+    Args:
+        model: Trained RNN model
+        character_to_num: Dictionary mapping characters to numbers
+        num_to_character: Dictionary mapping numbers to characters
+        seeds: List of starting texts (e.g., ["My dear fellow", "Holmes said"])
+        length: Number of characters to generate for each seed
+        temperature: Controls randomness (higher = more random)
+        ctx: Optional GenerationContext whose buffers are used instead of allocating new ones
+            for this call (the hidden state, input and output are always updated in place)
+        use_compile: Run the RNN steps through torch.compile (mode='reduce-overhead',
+            dynamic=False), with Dynamo's allow_rnn flag switched on only during each call.
+            Every distinct (model, batch size) compiles the shared step function once, and all
+            of them count towards torch._dynamo.config.recompile_limit for the process; once it
+            is reached, further ones raise FailOnRecompileLimitHit (pass use_compile=False)
+        verbose: Print every generated sample
+        encoded: Optional seeds already encoded with encode_seeds
+    
+    Returns:
+        List of generated texts (seed phrase + generated characters), one per seed; seeds
+        with no character in the vocabulary are skipped and get an empty string
+    
+    The model should already be in eval mode (call model.eval() once before generating).
+    """
+    # Convert the seed phrases to a padded batch of character indices
+    if encoded is None:
+        encoded = encode_seeds(character_to_num, seeds)
+        if encoded is None:
+            return [""] * len(seeds)
+    seed_tensor, seed_lengths, kept = encoded
+    max_len, batch_size = seed_tensor.shape
+    
+    # Padded positions must not advance the hidden state
+    pad_mask = (torch.arange(max_len, device=seed_tensor.device).unsqueeze(1)
+                >= (max_len - seed_lengths).unsqueeze(0))
+    
+    # Lookup table for decoding all generated indices in one go
+    id_to_character = np.array([num_to_character[i] for i in range(len(num_to_character))])
+    
+    # Initialize the hidden state, input and output buffers every step writes into
+    # (the hidden state is always a tensor, so every step sees the same input signature)
+    if ctx is not None:
+        hidden_state, input_buffer, generated_indices = ctx.buffers(batch_size, length)
+    else:
+        hidden_state = torch.zeros_like(model(seed_tensor[:1], None)[1])
+        input_buffer = torch.empty((1, batch_size), dtype=torch.long, device='cuda')
+        generated_indices = torch.empty((length, batch_size), dtype=torch.long, device='cuda')
+    
+    step_model = _compiled_model(model) if use_compile else model
+    
+    # Use the seed phrases to initialize the model. All seeds are primed together in
+    # max_len - 1 batched steps, so phrases that share a prefix cost no extra steps.
+    for i in range(max_len - 1):
+        if use_compile:
+            # Start a new CUDA graph generation for every step (torch.where below consumes
+            # the output before the next replay overwrites it)
+            torch.compiler.cudagraph_mark_step_begin()
+        output, new_hidden_state = step_model(seed_tensor[i:i+1], hidden_state)
+        torch.where(pad_mask[i].view(1, -1, 1), new_hidden_state, hidden_state, out=hidden_state)
+    
+    # Now generate new text, one timestep for the whole batch
+    current_input = input_buffer.copy_(seed_tensor[-1:])  # Last character of every seed
+    
+    for step in range(length):
+        if use_compile:
+            torch.compiler.cudagraph_mark_step_begin()
+        output, new_hidden_state = step_model(current_input, hidden_state)
+        # Outputs of the compiled CUDA graphs are overwritten by the next replay,
+        # so the new hidden state is copied into the buffer that is fed back in
+        hidden_state.copy_(new_hidden_state)
+        
+        # Apply temperature scaling in place and sample the next character of every seed
+        logits = output.view(batch_size, -1).div_(temperature)
+        sample = torch.multinomial(torch.softmax(logits, dim=-1), 1)
+        generated_indices[step] = sample.squeeze(1)
+        
+        # Update input for next iteration (the buffer is laid out like seed_tensor[-1:],
+        # so the compiled step's stride guards keep matching)
+        current_input.copy_(sample.view(1, -1))
+    
+    # Decode every generated character at once
+    generated_chars = id_to_character[generated_indices.cpu().numpy()]
+    
+    generated_texts = [""] * len(seeds)
+    for b, i in enumerate(kept):
+        generated_texts[i] = seeds[i] + ''.join(generated_chars[:, b])
+    
+    # Print every sample with a single write
+    if verbose:
+        sys.stdout.write(''.join(_format_generation(seeds[i], generated_texts[i]) for i in kept))
+    return generated_texts
+
 def test_temperature_effects(model, character_to_num, num_to_character):
     """Test how temperature affects text generation"""
     print("Testing Temperature Effects:")
     print("="*60)
     
+    model.eval()
+    
     seed_phrase = "My dear Watson"
     temperatures = [0.3, 0.5, 0.8, 1.0, 1.5, 2.0]
+    ctx = GenerationContext(model, max_length=100)
+    seed_tensor = encode_seed(character_to_num, seed_phrase)
     
     for temp in temperatures:
         print(f"\nTemperature: {temp}")
         print("-" * 30)
         generate_text_with_seed(model, character_to_num, num_to_character, 
-                              seed_phrase, length=100, temperature=temp)
+                              seed_phrase, length=100, temperature=temp, ctx=ctx,
+                              seed_tensor=seed_tensor)
 
 def test_seed_lengths(model, character_to_num, num_to_character):
     """Test how seed phrase length affects generation"""
     print("\nTesting Seed Phrase Lengths:")
     print("="*60)
     
+    model.eval()
+    
     # Different length seed phrases
     seeds = {
         "Short (1-3 chars)": ["I", "He", "The"],
@@ -107,18 +416,33 @@ def test_seed_lengths(model, character_to_num, num_to_character):
         "Long (9+ chars)": ["My dear fellow", "The game is afoot", "I have observed"]
     }
     
-    for category, seed_list in seeds.items():
-        print(f"\n{category}:")
-        print("-" * 30)
-        for seed in seed_list:
-            generate_text_with_seed(model, character_to_num, num_to_character, 
-                                  seed, length=80, temperature=0.8)
+    # Flatten into one plan and generate every seed in a single batch
+    all_seeds = [(category, seed) for category, seed_list in seeds.items() for seed in seed_list]
+    seed_phrases = [seed for _, seed in all_seeds]
+    encoded = encode_seeds(character_to_num, seed_phrases)
+    if encoded is None:
+        return
+    samples = generate_text_batched(model, character_to_num, num_to_character, 
+                                    seed_phrases, length=80, temperature=0.8,
+                                    encoded=encoded, verbose=False)
+    
+    # Split the batch back per category (skipped seeds come back empty)
+    current_category = None
+    for (category, seed), text in zip(all_seeds, samples):
+        if category != current_category:
+            current_category = category
+            print(f"\n{category}:")
+            print("-" * 30)
+        if text:
+            sys.stdout.write(_format_generation(seed, text))
 
 def test_sherlock_phrases(model, character_to_num, num_to_character):
     """Test with classic Sherlock Holmes phrases"""
     print("\nTesting Classic Sherlock Holmes Phrases:")
     print("="*60)
     
+    model.eval()
+    
     classic_phrases = [
         "My dear fellow",
         "Elementary, my dear Watson",
@@ -132,9 +456,8 @@ def test_sherlock_phrases(model, character_to_num, num_to_character):
         "I deduce that"
     ]
     
-    for phrase in classic_phrases:
-        generate_text_with_seed(model, character_to_num, num_to_character, 
-                              phrase, length=120, temperature=0.8)
+    generate_text_batched(model, character_to_num, num_to_character, 
+                          classic_phrases, length=120, temperature=0.8)
 
 def interactive_generation(model, character_to_num, num_to_character):
     """Interactive text generation"""
@@ -142,6 +465,8 @@ def interactive_generation(model, character_to_num, num_to_character):
     print("="*60)
     print("Enter your own seed phrases (type 'quit' to exit):")
     
+    model.eval()
+    
     while True:
         seed = input("\nEnter seed phrase: ").strip()
         if seed.lower() == 'quit':
@@ -163,19 +488,28 @@ def analyze_generation_quality(model, character_to_num, num_to_character, num_sa
     print("\nAnalyzing Generation Quality:")
     print("="*60)
     
+    model.eval()
+    
     test_phrases = ["My dear Watson", "The case was", "Holmes observed", "I have deduced", "Elementary"]
     
-    for phrase in test_phrases:
+    # Generate every sample of every phrase in one batch
+    batch_phrases = [phrase for phrase in test_phrases for _ in range(num_samples)]
+    all_samples = generate_text_batched(model, character_to_num, num_to_character, 
+                                        batch_phrases, length=100, temperature=0.8,
+                                        verbose=False)
+    
+    for p, phrase in enumerate(test_phrases):
         print(f"\nAnalyzing: '{phrase}'")
         print("-" * 40)
         
-        # Generate multiple samples
-        samples = []
-        for i in range(num_samples):
-            print(f"\nSample {i+1}:")
-            text = generate_text_with_seed(model, character_to_num, num_to_character, 
-                                         phrase, length=100, temperature=0.8)
-            samples.append(text)
+        # Phrases with no known character were reported by the batch and are skipped
+        samples = all_samples[p * num_samples:(p + 1) * num_samples]
+        if not samples[0]:
+            print("Skipped: no valid characters in seed phrase")
+            continue
+        
+        sys.stdout.write(''.join(f"\nSample {i+1}:\n" + _format_generation(phrase, text)
+                                 for i, text in enumerate(samples)))
         
         # Basic analysis
         avg_length = sum(len(s) for s in samples) / len(samples)
@@ -183,10 +517,8 @@ def analyze_generation_quality(model, character_to_num, num_to_character, num_sa
         
         # Check for common words
         common_words = ['the', 'and', 'of', 'to', 'a', 'in', 'is', 'it', 'you', 'that']
-        word_counts = {}
-        for word in common_words:
-            count = sum(s.lower().count(word) for s in samples)
-            word_counts[word] = count
+        joined = ' '.join(samples).lower()
+        word_counts = {word: joined.count(word) for word in common_words}
         
         print("Common word frequency:")
         for word, count in sorted(word_counts.items(), key=lambda x: x[1], reverse=True):
@@ -201,4 +533,5 @@ if __name__ == "__main__":
     print("\nExample usage:")
     print("test_temperature_effects(rnn, character_to_num, num_to_character)")
     print("test_sherlock_phrases(rnn, character_to_num, num_to_character)")
+    print("generate_text_batched(rnn, character_to_num, num_to_character, [\"Holmes said\", \"My dear Watson\"])")
     print("interactive_generation(rnn, character_to_num, num_to_character)")
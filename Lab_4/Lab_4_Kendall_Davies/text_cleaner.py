@@ -6,6 +6,32 @@ This program cleans and formats the sherlock.txt file for better RNN training.
 
 import re
 import string
+from collections import Counter
+
+# Bytes missing from string.printable (control characters other than whitespace, DEL
+# and everything above ASCII), deleted with bytes.translate
+_DELETE_BYTES = bytes(b for b in range(256) if chr(b) not in string.printable)
+
+# Page numbers, chapter markers, repeated punctuation and runs of spaces/tabs, applied in
+# order with literal replacements
+_CLEANUP_RULES = [
+    (re.compile(rb'\n\s*\d+\s*\n'), b'\n'),                                # Standalone numbers that are likely page numbers
+    (re.compile(rb'^\s*\d+\s*$', re.MULTILINE), b''),                       # Numbers at the beginning of lines
+    (re.compile(rb'^\s*CHAPTER\s+\d+.*$', re.MULTILINE | re.IGNORECASE), b''),  # "CHAPTER" followed by numbers
+    (re.compile(rb'^\s*\d+\.\s*$', re.MULTILINE), b''),                     # Lines that are just "12."
+    (re.compile(rb'[ \t]+'), b' '),                                         # Multiple spaces -> single space
+    (re.compile(rb'[.]{2,}'), b'.'),                                        # Multiple periods -> single period
+    (re.compile(rb'[!]{2,}'), b'!'),                                        # Multiple exclamations -> single
+    (re.compile(rb'[?]{2,}'), b'?'),                                        # Multiple questions -> single
+    (re.compile(rb'-{3,}'), b'--'),                                         # Multiple dashes -> double dash
+]
+
+# Multiple newlines and leading/trailing whitespace on lines
+_PARAGRAPH_PATTERN = re.compile(rb'\n\s*\n\s*\n+')
+_LINE_STRIP_PATTERN = re.compile(rb'^[ \t]+|[ \t]+$', re.MULTILINE)
+
+# Sentence boundaries used by analyze_text_quality
+_SENTENCE_SPLIT_PATTERN = re.compile(r'[.!?]+')
 
 def clean_sherlock_text(input_file, output_file):
     """
@@ -18,55 +44,39 @@ def clean_sherlock_text(input_file, output_file):
     
     print(f"Reading text from: {input_file}")
     
-    # Read the original text
+    # Read the original text (text mode, so CRLF/CR line endings become \n)
     with open(input_file, 'r', encoding='utf-8') as f:
         text = f.read()
     
     print(f"Original text length: {len(text)} characters")
     
-    # Step 1: Remove page numbers (common patterns)
-    # Remove standalone numbers that are likely page numbers
-    text = re.sub(r'\n\s*\d+\s*\n', '\n', text)
-    
-    # Remove numbers at the beginning of lines (often page numbers)
-    text = re.sub(r'^\s*\d+\s*$', '', text, flags=re.MULTILINE)
+    # Step 1: Clean up quotes and apostrophes
+    # Normalize different types of quotes before the filter below would drop them
+    # (str.translate on non-ASCII text falls back to a slow per-character path)
+    text = text.replace('\u201c', '"').replace('\u201d', '"')  # Smart quotes to regular quotes
+    text = text.replace('\u2018', "'").replace('\u2019', "'")  # Smart apostrophes to regular
     
-    # Step 2: Remove chapter markers and headers
-    # Remove lines that are just numbers or "CHAPTER" followed by numbers
-    text = re.sub(r'^\s*CHAPTER\s+\d+.*$', '', text, flags=re.MULTILINE | re.IGNORECASE)
-    text = re.sub(r'^\s*\d+\.\s*$', '', text, flags=re.MULTILINE)
+    # Step 2: Remove or replace problematic characters
+    # Keep only printable characters, letters, punctuation, and whitespace
+    # This removes control characters and other non-printable characters;
+    # everything left is ASCII, so the regex passes below run on bytes
+    data = text.encode('ascii', 'ignore').translate(None, _DELETE_BYTES)
     
-    # Step 3: Clean up excessive whitespace
-    # Replace multiple spaces with single space (but preserve single spaces)
-    text = re.sub(r'[ \t]+', ' ', text)
+    # Step 3: Remove page numbers and chapter markers, collapse spaces,
+    # normalize punctuation and remove excessive dashes
+    for pattern, replacement in _CLEANUP_RULES:
+        data = pattern.sub(replacement, data)
     
+    # Step 4: Clean up excessive whitespace
     # Replace multiple newlines with double newlines (paragraph breaks)
-    text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
+    data = _PARAGRAPH_PATTERN.sub(b'\n\n', data)
     
     # Remove leading/trailing whitespace from lines (but preserve spaces between words)
-    text = re.sub(r'^[ \t]+|[ \t]+$', '', text, flags=re.MULTILINE)
-    
-    # Step 4: Remove or replace problematic characters
-    # Keep only printable characters, letters, punctuation, and whitespace
-    # This removes control characters and other non-printable characters
-    printable_chars = set(string.printable)
-    text = ''.join(char for char in text if char in printable_chars)
-    
-    # Step 5: Normalize punctuation
-    # Replace multiple punctuation marks with single ones
-    text = re.sub(r'[.]{2,}', '.', text)  # Multiple periods -> single period
-    text = re.sub(r'[!]{2,}', '!', text)  # Multiple exclamations -> single
-    text = re.sub(r'[?]{2,}', '?', text)  # Multiple questions -> single
-    
-    # Step 6: Clean up quotes and apostrophes
-    # Normalize different types of quotes
-    text = text.replace('"', '"').replace('"', '"')  # Smart quotes to regular quotes
-    text = text.replace(''', "'").replace(''', "'")  # Smart apostrophes to regular
+    data = _LINE_STRIP_PATTERN.sub(b'', data)
     
-    # Step 7: Remove excessive dashes
-    text = re.sub(r'-{3,}', '--', text)  # Multiple dashes -> double dash
+    text = data.decode('ascii')
     
-    # Step 8: Final cleanup
+    # Step 5: Final cleanup
     # Remove empty lines at the beginning and end
     text = text.strip()
     
@@ -96,15 +106,13 @@ def analyze_text_quality(text):
     print("\n=== TEXT QUALITY ANALYSIS ===")
     
     # Character frequency analysis
-    char_freq = {}
-    for char in text:
-        char_freq[char] = char_freq.get(char, 0) + 1
+    char_freq = Counter(text)
     
     # Sort by frequency
-    sorted_chars = sorted(char_freq.items(), key=lambda x: x[1], reverse=True)
+    sorted_chars = char_freq.most_common(20)
     
     print("Most frequent characters:")
-    for char, freq in sorted_chars[:20]:
+    for char, freq in sorted_chars:
         if char == '\n':
             print(f"  '\\n' (newline): {freq}")
         elif char == ' ':
@@ -118,7 +126,7 @@ def analyze_text_quality(text):
     print(f"Average word length: {sum(len(word) for word in words) / len(words):.2f}")
     
     # Sentence count
-    sentences = re.split(r'[.!?]+', text)
+    sentences = _SENTENCE_SPLIT_PATTERN.split(text)
     sentences = [s.strip() for s in sentences if s.strip()]
     print(f"Total sentences: {len(sentences)}")
     print(f"Average sentence length: {sum(len(s.split()) for s in sentences) / len(sentences):.2f} words")
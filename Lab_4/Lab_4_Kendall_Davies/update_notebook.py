@@ -20,25 +20,25 @@ def update_notebook_to_use_cleaned_text(notebook_path):
     
     # Find and update the cell that loads sherlock.txt
     for i, cell in enumerate(notebook['cells']):
-        if cell['cell_type'] == 'code':
-            source = ''.join(cell['source'])
+        if cell['cell_type'] != 'code':
+            continue
+        
+        # Look for the line that loads sherlock.txt
+        if any('sherlock.txt' in line for line in cell['source']):
+            print(f"Found sherlock.txt reference in cell {i}")
             
-            # Look for the line that loads sherlock.txt
-            if "sherlock.txt" in source:
-                print(f"Found sherlock.txt reference in cell {i}")
-                
-                # Replace sherlock.txt with sherlock_cleaned.txt
-                new_source = []
-                for line in cell['source']:
-                    if 'sherlock.txt' in line:
-                        new_line = line.replace('sherlock.txt', 'sherlock_cleaned.txt')
-                        print(f"  Updated: {line.strip()} -> {new_line.strip()}")
-                        new_source.append(new_line)
-                    else:
-                        new_source.append(line)
-                
-                cell['source'] = new_source
-                break
+            # Replace sherlock.txt with sherlock_cleaned.txt
+            new_source = []
+            for line in cell['source']:
+                if 'sherlock.txt' in line:
+                    new_line = line.replace('sherlock.txt', 'sherlock_cleaned.txt')
+                    print(f"  Updated: {line.strip()} -> {new_line.strip()}")
+                    new_source.append(new_line)
+                else:
+                    new_source.append(line)
+            
+            cell['source'] = new_source
+            break
     
     # Write the updated notebook
     with open(notebook_path, 'w', encoding='utf-8') as f: